@@ -2,32 +2,65 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import datetime as dt
+import functools
+import hashlib
 import html
 import json
+import math
 import os
 import re
 import shutil
 import subprocess
 import sys
-import tempfile
 import traceback
+from dataclasses import dataclass, replace
+from itertools import chain
 from pathlib import Path
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 AUTOMATION_DIR = Path(__file__).resolve().parent
 SCHEMA_PATH = AUTOMATION_DIR / "codex_cybersecurity_schema.json"
-PHP_LIST_TITLES = AUTOMATION_DIR / "wp_get_post_titles.php"
-PHP_LIST_CANDIDATES = AUTOMATION_DIR / "wp_get_profile_candidates.php"
+PHP_BOOTSTRAP_DATA = AUTOMATION_DIR / "wp_get_bootstrap_data.php"
 PHP_INSERT_POST = AUTOMATION_DIR / "wp_insert_post.php"
 LOCK_PATH = AUTOMATION_DIR / "cybersecurity_autopost.lock"
 LOG_DIR = AUTOMATION_DIR / "logs"
 DEFAULT_LOG_FILE = LOG_DIR / "cybersecurity_autopost.log"
 
-STOPWORDS = {
+_lock_fd: int | None = None
+
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SLUG_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_CONTENT_ANALYSIS_RE = re.compile(
+    r"(?P<h3><h3[^>]*>.*?\?</h3>)|(?P<faq>faq)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+NEAR_DUPLICATE_THRESHOLD = 0.72
+
+STOPWORDS = frozenset({
     "about",
     "after",
     "again",
@@ -64,13 +97,34 @@ STOPWORDS = {
     "which",
     "with",
     "your",
-}
+})
 
 
 class LockHeldError(RuntimeError):
     pass
 
 
+@dataclass(frozen=True)
+class ExistingCorpus:
+    titles: list[str]
+    normalized_titles: frozenset[str]
+    token_index: list[tuple[frozenset[str], int]]
+    candidates: list[str]
+    candidate_norm_set: frozenset[str]
+
+
+def json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dump_bytes(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
 def timestamp() -> str:
     return dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -93,25 +147,35 @@ def write_log(message: str, log_file: Path) -> None:
             pass
 
 
+def log_traceback(exc: BaseException, log_file: Path) -> None:
+    for line in traceback.format_exception(exc):
+        write_log(line.rstrip(), log_file)
+
+
 def run_command(
     args: list[str],
     *,
     cwd: Path = ROOT_DIR,
     stdin_text: str | None = None,
+    stdin_bytes: bytes | None = None,
     env: dict[str, str] | None = None,
     timeout_seconds: int | None = None,
 ) -> str:
+    # Pipes stay in binary mode and are decoded once at the end instead of going
+    # through the text-mode io wrappers. Popen (rather than subprocess.run) keeps
+    # the pid available for the Windows process-tree kill on timeout.
+    if stdin_bytes is None and stdin_text is not None:
+        stdin_bytes = stdin_text.encode("utf-8")
     process = subprocess.Popen(
         args,
         cwd=str(cwd),
-        stdin=subprocess.PIPE if stdin_text is not None else None,
+        stdin=subprocess.PIPE if stdin_bytes is not None else None,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
         env=env,
     )
     try:
-        stdout, stderr = process.communicate(input=stdin_text, timeout=timeout_seconds)
+        stdout_bytes, stderr_bytes = process.communicate(input=stdin_bytes, timeout=timeout_seconds)
     except subprocess.TimeoutExpired as exc:
         process.kill()
         if os.name == "nt":
@@ -124,10 +188,8 @@ def run_command(
             f"Command timed out after {timeout_seconds} seconds: {' '.join(args)}"
         ) from exc
 
-    if stdout is None:
-        stdout = ""
-    if stderr is None:
-        stderr = ""
+    stdout = (stdout_bytes or b"").decode("utf-8", errors="replace")
+    stderr = (stderr_bytes or b"").decode("utf-8", errors="replace")
 
     if process.returncode != 0:
         raise RuntimeError(
@@ -141,54 +203,87 @@ def run_command(
 
 
 def normalize_title(text: str) -> str:
-    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", text.lower())).strip()
+    return _WS_RE.sub(" ", _NON_ALNUM_RE.sub(" ", text.lower())).strip()
 
 
 def title_tokens(text: str) -> set[str]:
-    tokens = re.findall(r"[a-z0-9]+", text.lower())
+    tokens = _TOKEN_RE.findall(text.lower())
     return {token for token in tokens if len(token) > 2 and token not in STOPWORDS}
 
 
-def jaccard_similarity(left: set[str], right: set[str]) -> float:
+def jaccard_similarity(left: frozenset[str], right: frozenset[str]) -> float:
     if not left or not right:
         return 0.0
-    union = left | right
-    if not union:
-        return 0.0
-    return len(left & right) / len(union)
+    inter = len(left & right)
+    return inter / (len(left) + len(right) - inter)
+
+
+def precompute_title_index(titles: list[str]) -> list[tuple[frozenset[str], int]]:
+    index: list[tuple[frozenset[str], int]] = []
+    for title in titles:
+        tokens = frozenset(title_tokens(title))
+        if tokens:
+            index.append((tokens, len(tokens)))
+    # Sorted by token count so near_duplicate_title can bisect to the size window.
+    index.sort(key=lambda entry: entry[1])
+    return index
+
+
+def get_existing_data() -> tuple[list[str], list[str]]:
+    stdout = run_command(["php", str(PHP_BOOTSTRAP_DATA)])
+    payload = json_loads(stdout)
+    if not isinstance(payload, dict):
+        raise RuntimeError("wp_get_bootstrap_data.php returned unexpected data.")
+    titles = payload.get("titles")
+    candidates = payload.get("candidates")
+    if not isinstance(titles, list) or not isinstance(candidates, list):
+        raise RuntimeError("wp_get_bootstrap_data.php returned unexpected data.")
+    return (
+        [str(item).strip() for item in titles if str(item).strip()],
+        [str(item).strip() for item in candidates if str(item).strip()],
+    )
 
 
-def get_existing_titles() -> list[str]:
-    stdout = run_command(["php", str(PHP_LIST_TITLES)])
-    payload = json.loads(stdout)
-    if not isinstance(payload, list):
-        raise RuntimeError("wp_get_post_titles.php returned unexpected data.")
-    return [str(item).strip() for item in payload if str(item).strip()]
+def normalize_candidate_name(name: str) -> str:
+    return normalize_title(name)
 
 
-def get_existing_candidates() -> list[str]:
-    stdout = run_command(["php", str(PHP_LIST_CANDIDATES)])
-    payload = json.loads(stdout)
-    if not isinstance(payload, list):
-        raise RuntimeError("wp_get_profile_candidates.php returned unexpected data.")
-    return [str(item).strip() for item in payload if str(item).strip()]
+def build_existing_corpus(titles: list[str], candidates: list[str]) -> ExistingCorpus:
+    return ExistingCorpus(
+        titles=titles,
+        normalized_titles=frozenset(normalize_title(title) for title in titles),
+        token_index=precompute_title_index(titles),
+        candidates=candidates,
+        candidate_norm_set=frozenset(normalize_candidate_name(name) for name in candidates),
+    )
 
 
-def normalize_candidate_name(name: str) -> str:
-    return normalize_title(name)
+def extend_existing_corpus(corpus: ExistingCorpus, title: str, candidate: str) -> ExistingCorpus:
+    # Adds one accepted post without re-normalizing and re-tokenizing the whole corpus.
+    token_index = list(corpus.token_index)
+    tokens = frozenset(title_tokens(title))
+    if tokens:
+        bisect.insort_left(token_index, (tokens, len(tokens)), key=lambda entry: entry[1])
+    return replace(
+        corpus,
+        titles=[title, *corpus.titles],
+        normalized_titles=corpus.normalized_titles | {normalize_title(title)},
+        token_index=token_index,
+        candidates=[candidate, *corpus.candidates],
+        candidate_norm_set=corpus.candidate_norm_set | {normalize_candidate_name(candidate)},
+    )
 
 
 def build_prompt(
     topic: str,
-    existing_titles: list[str],
-    existing_candidates: list[str],
+    corpus: ExistingCorpus,
     min_sources: int,
     min_confidence: int,
 ) -> str:
     today = dt.date.today().isoformat()
-    capped_titles = existing_titles[:350]
+    capped_titles = corpus.titles[:350]
     title_block = "\n".join(f"- {title}" for title in capped_titles) if capped_titles else "- (none)"
-    capped_candidates = existing_candidates[:350]
+    capped_candidates = corpus.candidates[:350]
     candidate_block = "\n".join(f"- {name}" for name in capped_candidates) if capped_candidates else "- (none)"
 
     return (
@@ -232,7 +327,6 @@ def build_prompt(
 
 def run_codex(
     prompt: str,
-    output_path: Path,
     model: str | None,
     timeout_seconds: int,
 ) -> dict[str, Any]:
@@ -250,16 +344,19 @@ def run_codex(
             "--skip-git-repo-check",
             "--output-schema",
             str(SCHEMA_PATH),
-            "-o",
-            str(output_path),
             "-",
         ]
     )
-    run_command(cmd, stdin_text=prompt, env=env, timeout_seconds=timeout_seconds)
-    with output_path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+    # codex exec prints the final message on stdout (progress goes to stderr),
+    # so the response is parsed in memory instead of via an -o temp file.
+    stdout = run_command(cmd, stdin_text=prompt, env=env, timeout_seconds=timeout_seconds)
+    try:
+        return json_loads(stdout)
+    except json.JSONDecodeError as exc:
+        raise RuntimeError(f"Codex returned non-JSON output: {stdout[:500]}") from exc
 
 
+@functools.lru_cache(maxsize=1)
 def resolve_codex_binary() -> str:
     explicit = os.environ.get("CODEX_BIN", "").strip()
     if explicit:
@@ -281,30 +378,37 @@ def resolve_codex_binary() -> str:
     )
 
 
-def domain_from_url(url: str) -> str:
-    parsed = urlparse(str(url or "").strip())
-    host = parsed.netloc.lower().strip()
-    if host.startswith("www."):
-        host = host[4:]
-    return host
+@functools.lru_cache(maxsize=1024)
+def _domain_from_url(url: str) -> str:
+    host = urlsplit(url.strip()).netloc.lower().strip()
+    return host.removeprefix("www.")
+
+
+def domain_from_url(url: Any) -> str:
+    # Coerced before the cached call: model JSON can put unhashable values (e.g. a list) here.
+    return _domain_from_url(str(url or ""))
 
 
 def normalize_ws(text: str) -> str:
-    return re.sub(r"\s+", " ", str(text or "")).strip()
+    return _WS_RE.sub(" ", str(text or "")).strip()
+
+
+@functools.lru_cache(maxsize=16)
+def _get_trim_re(max_chars: int) -> re.Pattern[str]:
+    # Longest prefix of at most max_chars that is followed by whitespace, i.e. ends on a word boundary.
+    return re.compile(rf"(.{{0,{max_chars}}})\s")
 
 
 def trim_to_max_chars(text: str, max_chars: int) -> str:
     text = normalize_ws(text)
     if len(text) <= max_chars:
         return text
-    clipped = text[:max_chars].rstrip()
-    if " " in clipped:
-        clipped = clipped.rsplit(" ", 1)[0]
-    return clipped.rstrip(" ,;:-")
+    match = _get_trim_re(max_chars).match(text)
+    return (match.group(1) if match else text[:max_chars]).rstrip(" ,;:-")
 
 
 def trim_slug(slug: str, max_chars: int = 120) -> str:
-    normalized = "-".join(re.findall(r"[a-z0-9]+", normalize_ws(slug).lower()))
+    normalized = "-".join(_TOKEN_RE.findall(normalize_ws(slug).lower()))
     trimmed = trim_to_max_chars(normalized, max_chars).strip("-")
     if trimmed:
         return trimmed
@@ -314,20 +418,23 @@ def trim_slug(slug: str, max_chars: int = 120) -> str:
 def expand_to_min_chars(text: str, min_chars: int, max_chars: int, fallback: str) -> str:
     text = normalize_ws(text)
     fallback = normalize_ws(fallback)
+    if len(text) < min_chars and fallback and fallback.lower() not in text.lower():
+        text = f"{text} {fallback}".strip()
+    # Trimming to a word boundary can also drop an over-long text below min_chars.
+    text = trim_to_max_chars(text, max_chars)
     if len(text) >= min_chars:
-        return trim_to_max_chars(text, max_chars)
-
-    if fallback and fallback.lower() not in text.lower():
-        sep = " " if text else ""
-        text = f"{text}{sep}{fallback}".strip()
+        return text
 
+    # Top up with whole pad words, stopping at the first word boundary at or past
+    # min_chars so nothing is stripped back below it afterwards.
     pad = " Stay updated with key risks, practical defenses, and actionable mitigation guidance."
-    while len(text) < min_chars:
-        remaining = min_chars - len(text)
-        chunk = pad[:remaining]
-        text = f"{text}{chunk}".strip()
-
-    return trim_to_max_chars(text, max_chars)
+    padded = f"{text}{pad * (min_chars // len(pad) + 2)}".lstrip()
+    end = padded.find(" ", min_chars)
+    while end != -1 and padded[end - 1] in ",;:-":
+        end = padded.find(" ", end + 1)
+    if end == -1 or end > max_chars:
+        return padded[:max_chars].rstrip()
+    return padded[:end]
 
 
 def normalize_seo_fields(payload: dict[str, Any]) -> dict[str, Any]:
@@ -344,29 +451,25 @@ def normalize_seo_fields(payload: dict[str, Any]) -> dict[str, Any]:
 
     focus_keyphrase = normalize_ws(seo.get("focus_keyphrase", ""))
     if not focus_keyphrase:
-        words = [w for w in re.findall(r"[a-z0-9]+", title.lower()) if len(w) > 2]
+        words = [w for w in _TOKEN_RE.findall(title.lower()) if len(w) > 2]
         focus_keyphrase = " ".join(words[:4]) or "nepal election candidate profile"
     seo["focus_keyphrase"] = focus_keyphrase
+    focus_keyphrase_lower = focus_keyphrase.lower()
 
     meta_title = normalize_ws(seo.get("meta_title", "")) or title
-    if focus_keyphrase.lower() not in meta_title.lower():
+    if focus_keyphrase_lower not in meta_title.lower():
         meta_title = f"{focus_keyphrase.title()}: {meta_title}".strip()
     meta_title = expand_to_min_chars(meta_title, 45, 65, title)
     seo["meta_title"] = meta_title
 
     meta_description = normalize_ws(seo.get("meta_description", "")) or excerpt
-    if focus_keyphrase.lower() not in meta_description.lower():
+    if focus_keyphrase_lower not in meta_description.lower():
         meta_description = f"{focus_keyphrase}: {meta_description}".strip(": ")
     meta_description = expand_to_min_chars(meta_description, 130, 170, excerpt or title)
     seo["meta_description"] = meta_description
 
-    seo_slug_hint = normalize_ws(seo.get("seo_slug_hint", ""))
-    if not seo_slug_hint:
-        seo_slug_hint = "-".join(re.findall(r"[a-z0-9]+", focus_keyphrase.lower()))
-    seo["seo_slug_hint"] = trim_slug(seo_slug_hint, 120)
-
     slug = trim_slug(payload.get("slug", ""), 120)
-    focus_slug = "-".join(re.findall(r"[a-z0-9]+", focus_keyphrase.lower()))
+    focus_slug = "-".join(_TOKEN_RE.findall(focus_keyphrase_lower))
     if focus_slug and focus_slug not in slug:
         combined_slug = "-".join(part for part in (focus_slug, slug) if part)
         payload["slug"] = trim_slug(combined_slug, 120)
@@ -379,23 +482,48 @@ def normalize_seo_fields(payload: dict[str, Any]) -> dict[str, Any]:
     return payload
 
 
-def near_duplicate_title(new_title: str, existing_titles: list[str]) -> bool:
-    normalized_new = normalize_title(new_title)
-    new_tokens = title_tokens(new_title)
-    for existing in existing_titles:
-        if normalized_new == normalize_title(existing):
-            return True
-        score = jaccard_similarity(new_tokens, title_tokens(existing))
-        if score >= 0.72:
+def near_duplicate_title(new_title: str, corpus: ExistingCorpus) -> bool:
+    if normalize_title(new_title) in corpus.normalized_titles:
+        return True
+    new_tokens = frozenset(title_tokens(new_title))
+    if not new_tokens:
+        return False
+    # Jaccard can never reach the threshold when the token counts differ by
+    # more than the threshold ratio, so only the matching size window is scored.
+    size = len(new_tokens)
+    min_size = math.floor(NEAR_DUPLICATE_THRESHOLD * size)
+    max_size = math.ceil(size / NEAR_DUPLICATE_THRESHOLD)
+    token_index = corpus.token_index
+    start = bisect.bisect_left(token_index, min_size, key=lambda entry: entry[1])
+    stop = bisect.bisect_right(token_index, max_size, key=lambda entry: entry[1])
+    for position in range(start, stop):
+        if jaccard_similarity(new_tokens, token_index[position][0]) >= NEAR_DUPLICATE_THRESHOLD:
             return True
     return False
 
 
+def find_keywords(text: str, keywords: set[str]) -> set[str]:
+    keywords = {keyword for keyword in keywords if keyword}
+    if ahocorasick is None or len(keywords) < 2:
+        return {keyword for keyword in keywords if keyword in text}
+
+    # One automaton pass over the body instead of a separate scan per keyword.
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    found: set[str] = set()
+    for _, keyword in automaton.iter(text):
+        found.add(keyword)
+        if len(found) == len(keywords):
+            break
+    return found
+
+
 def validate_payload(
     payload: dict[str, Any],
     *,
-    existing_titles: list[str],
-    existing_candidates: list[str],
+    corpus: ExistingCorpus,
     min_sources: int,
     min_confidence: int,
 ) -> list[str]:
@@ -412,18 +540,20 @@ def validate_payload(
         return errors
 
     title = str(payload.get("title", "")).strip()
+    title_lower = title.lower()
     if not title:
         errors.append("Missing title.")
     elif len(title) < 24:
         errors.append("Title is too short.")
-    elif near_duplicate_title(title, existing_titles):
+    elif near_duplicate_title(title, corpus):
         errors.append("Generated title appears to duplicate an existing topic.")
 
     slug = str(payload.get("slug", "")).strip()
-    if not re.fullmatch(r"[a-z0-9]+(?:-[a-z0-9]+)*", slug):
+    if not _SLUG_RE.fullmatch(slug):
         errors.append("Slug must be kebab-case.")
 
     excerpt = str(payload.get("excerpt", "")).strip()
+    excerpt_lower = excerpt.lower()
     if len(excerpt) < 110:
         errors.append("Excerpt is too short.")
 
@@ -435,9 +565,19 @@ def validate_payload(
     if len(content_html) < 1800:
         errors.append("content_html is too short for the required depth.")
     content_html_lower = content_html.lower()
-    if "faq" not in content_html_lower:
+    faq_question_count = 0
+    faq_seen = False
+    for match in _CONTENT_ANALYSIS_RE.finditer(content_html):
+        question = match.group("h3")
+        if question is None:
+            faq_seen = True
+            continue
+        faq_question_count += 1
+        # The question match consumes its text, so look for "faq" inside it too.
+        if not faq_seen and "faq" in question.lower():
+            faq_seen = True
+    if not faq_seen:
         errors.append("content_html must include an FAQ section for SEO.")
-    faq_question_count = len(re.findall(r"<h3[^>]*>.*?\?</h3>", content_html, flags=re.IGNORECASE | re.DOTALL))
     if faq_question_count < 3:
         errors.append("FAQ section should include at least 3 questions in H3 tags.")
 
@@ -448,18 +588,17 @@ def validate_payload(
     if len(sources) < min_sources:
         errors.append(f"Need at least {min_sources} sources; found {len(sources)}.")
 
-    source_urls = {
-        str(source.get("url", "")).strip()
-        for source in sources
-        if isinstance(source, dict) and str(source.get("url", "")).strip().startswith("http")
-    }
-
-    unique_domains = {
-        (str(source.get("domain", "")).strip().lower() or domain_from_url(str(source.get("url", ""))))
-        for source in sources
-        if isinstance(source, dict)
-    }
-    unique_domains = {domain for domain in unique_domains if domain}
+    source_urls_stripped: set[str] = set()
+    unique_domains: set[str] = set()
+    for source in sources:
+        if not isinstance(source, dict):
+            continue
+        url = str(source.get("url", "")).strip()
+        if url.startswith("http"):
+            source_urls_stripped.add(url.rstrip("/"))
+        domain = str(source.get("domain", "")).strip().lower() or domain_from_url(url)
+        if domain:
+            unique_domains.add(domain)
     if len(unique_domains) < min_sources:
         errors.append(
             f"Need at least {min_sources} unique source domains; found {len(unique_domains)}."
@@ -501,8 +640,7 @@ def validate_payload(
         errors.append("candidate_profile.profile_source_url must be a valid URL.")
 
     if profile_source_url:
-        normalized_source_urls = {url.rstrip("/") for url in source_urls}
-        if profile_source_url.rstrip("/") not in normalized_source_urls and domain_from_url(profile_source_url) not in unique_domains:
+        if profile_source_url.rstrip("/") not in source_urls_stripped and domain_from_url(profile_source_url) not in unique_domains:
             errors.append("candidate_profile.profile_source_url must be included in sources.")
 
     if profile_image_url and not profile_image_url.startswith("http"):
@@ -510,19 +648,9 @@ def validate_payload(
     if profile_image_source_url and not profile_image_source_url.startswith("http"):
         errors.append("candidate_profile.profile_image_source_url must be a valid URL when provided.")
 
-    existing_candidate_set = {normalize_candidate_name(name) for name in existing_candidates}
-    if candidate_name and normalize_candidate_name(candidate_name) in existing_candidate_set:
+    if candidate_name and normalize_candidate_name(candidate_name) in corpus.candidate_norm_set:
         errors.append("Candidate has already been profiled in earlier posts.")
 
-    candidate_tokens = {token for token in title_tokens(candidate_name) if len(token) >= 3}
-    if candidate_tokens:
-        if len([token for token in candidate_tokens if token in title.lower()]) < 1:
-            errors.append("Title should include candidate name.")
-        if len([token for token in candidate_tokens if token in excerpt.lower()]) < 1:
-            errors.append("Excerpt should include candidate name.")
-        if len([token for token in candidate_tokens if token in content_html_lower]) < 2:
-            errors.append("content_html should include candidate context clearly.")
-
     seo = payload.get("seo", {})
     if not isinstance(seo, dict):
         errors.append("seo must be an object.")
@@ -530,8 +658,20 @@ def validate_payload(
     focus_keyphrase = str(seo.get("focus_keyphrase", "")).strip().lower()
     meta_title = str(seo.get("meta_title", "")).strip()
     meta_description = str(seo.get("meta_description", "")).strip()
+    meta_title_lower = meta_title.lower()
+    meta_description_lower = meta_description.lower()
     seo_slug_hint = str(seo.get("seo_slug_hint", "")).strip().lower()
 
+    candidate_tokens = {token for token in title_tokens(candidate_name) if len(token) >= 3}
+    content_hits = find_keywords(content_html_lower, {focus_keyphrase, *candidate_tokens})
+    if candidate_tokens:
+        if not any(token in title_lower for token in candidate_tokens):
+            errors.append("Title should include candidate name.")
+        if not any(token in excerpt_lower for token in candidate_tokens):
+            errors.append("Excerpt should include candidate name.")
+        if sum(1 for token in candidate_tokens if token in content_hits) < 2:
+            errors.append("content_html should include candidate context clearly.")
+
     if len(focus_keyphrase) < 8:
         errors.append("seo.focus_keyphrase is too short.")
     if not (45 <= len(meta_title) <= 65):
@@ -539,22 +679,22 @@ def validate_payload(
     if not (130 <= len(meta_description) <= 170):
         errors.append("seo.meta_description should be between 130 and 170 characters.")
 
-    focus_slug = "-".join(re.findall(r"[a-z0-9]+", focus_keyphrase))
+    focus_slug = "-".join(_TOKEN_RE.findall(focus_keyphrase))
     if focus_keyphrase:
-        if focus_keyphrase not in title.lower():
+        if focus_keyphrase not in title_lower:
             errors.append("Title should include seo.focus_keyphrase.")
-        if focus_keyphrase not in excerpt.lower():
+        if focus_keyphrase not in excerpt_lower:
             errors.append("Excerpt should include seo.focus_keyphrase.")
-        if focus_keyphrase not in content_html_lower:
+        if focus_keyphrase not in content_hits:
             errors.append("content_html should include seo.focus_keyphrase.")
-        if focus_keyphrase not in meta_title.lower():
+        if focus_keyphrase not in meta_title_lower:
             errors.append("seo.meta_title should include seo.focus_keyphrase.")
-        if focus_keyphrase not in meta_description.lower():
+        if focus_keyphrase not in meta_description_lower:
             errors.append("seo.meta_description should include seo.focus_keyphrase.")
         if focus_slug and focus_slug not in slug:
             errors.append("Slug should include the focus keyphrase in kebab-case.")
 
-    normalized_hint = "-".join(re.findall(r"[a-z0-9]+", seo_slug_hint))
+    normalized_hint = "-".join(_TOKEN_RE.findall(seo_slug_hint))
     if normalized_hint and normalized_hint != slug:
         errors.append("seo.seo_slug_hint should align with the final slug.")
 
@@ -581,22 +721,31 @@ def validate_payload(
     return errors
 
 
+def _render_source(source: dict[str, Any]) -> str:
+    url = str(source.get("url", "")).strip()
+    if not url.startswith("http"):
+        return ""
+    domain = str(source.get("domain", "")).strip() or domain_from_url(url)
+    publisher = str(source.get("publisher", "")).strip() or domain
+    label = f"{publisher} ({domain})".strip()
+    return (
+        f'<li><a href="{html.escape(url, quote=True)}" rel="nofollow noopener" '
+        f'target="_blank">{html.escape(label)}</a></li>'
+    )
+
+
 def build_sources_section(sources: list[dict[str, Any]]) -> str:
-    items: list[str] = []
-    for source in sources:
-        url = str(source.get("url", "")).strip()
-        if not url.startswith("http"):
-            continue
-        domain = str(source.get("domain", "")).strip() or domain_from_url(url)
-        publisher = str(source.get("publisher", "")).strip() or domain
-        label = f"{publisher} ({domain})".strip()
-        items.append(
-            f'<li><a href="{html.escape(url, quote=True)}" rel="nofollow noopener" '
-            f'target="_blank">{html.escape(label)}</a></li>'
-        )
-    if not items:
+    rendered = (item for item in map(_render_source, sources) if item)
+    first = next(rendered, None)
+    if first is None:
         return ""
-    return "<h2>Sources</h2>\n<ol>\n" + "\n".join(items) + "\n</ol>"
+    return "".join(
+        chain(
+            ("<h2>Sources</h2>\n<ol>\n", first),
+            ("\n" + item for item in rendered),
+            ("\n</ol>",),
+        )
+    )
 
 
 def build_candidate_media_section(candidate_profile: dict[str, Any]) -> str:
@@ -621,7 +770,18 @@ def build_candidate_media_section(candidate_profile: dict[str, Any]) -> str:
     )
 
 
-def insert_post(payload: dict[str, Any], post_status: str) -> dict[str, Any]:
+def idempotency_key(payload: dict[str, Any]) -> str:
+    # A retry on a later cron tick regenerates the whole profile, so the key is
+    # the candidate being profiled (or the slug when there is none), not the text.
+    candidate_profile = payload.get("candidate_profile")
+    if not isinstance(candidate_profile, dict):
+        candidate_profile = {}
+    candidate = normalize_candidate_name(str(candidate_profile.get("candidate_name", "")))
+    identity = f"candidate:{candidate}" if candidate else f"slug:{trim_slug(str(payload.get('slug', '')))}"
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def build_post_payload(payload: dict[str, Any], post_status: str) -> dict[str, Any]:
     content_html = str(payload["content_html"]).strip()
     candidate_profile = payload.get("candidate_profile", {})
     if not isinstance(candidate_profile, dict):
@@ -647,35 +807,74 @@ def insert_post(payload: dict[str, Any], post_status: str) -> dict[str, Any]:
         "sources": payload.get("sources", []),
         "category_name": "Nepal Election 2026",
     }
-    stdout = run_command(["php", str(PHP_INSERT_POST)], stdin_text=json.dumps(post_payload))
-    return json.loads(stdout)
+    post_payload["idempotency_key"] = idempotency_key(post_payload)
+    return post_payload
+
+
+def insert_posts(payloads: list[dict[str, Any]], post_status: str) -> list[dict[str, Any]]:
+    # One PHP call (and one WordPress bootstrap) for the whole batch.
+    post_payloads = [build_post_payload(payload, post_status) for payload in payloads]
+    stdout = run_command(["php", str(PHP_INSERT_POST)], stdin_bytes=json_dump_bytes({"posts": post_payloads}))
+    response = json_loads(stdout)
+    results = response.get("results") if isinstance(response, dict) else None
+    if not isinstance(results, list):
+        raise RuntimeError("wp_insert_post.php returned unexpected data.")
+    return results
 
 
 def save_debug_payload(payload: dict[str, Any]) -> Path:
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     stamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
     output = LOG_DIR / f"last_payload_{stamp}.json"
-    with output.open("w", encoding="utf-8") as handle:
-        json.dump(payload, handle, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        output.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        with output.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, ensure_ascii=False)
     return output
 
 
-def acquire_lock(stale_after_minutes: int) -> None:
-    if LOCK_PATH.exists():
-        age_seconds = dt.datetime.now().timestamp() - LOCK_PATH.stat().st_mtime
-        if age_seconds > stale_after_minutes * 60:
-            LOCK_PATH.unlink(missing_ok=True)
+def _try_lock_fd(fd: int) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
         else:
-            raise LockHeldError(
-                f"Lock file exists at {LOCK_PATH}. Another run may still be active."
-            )
-    fd = os.open(str(LOCK_PATH), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-    with os.fdopen(fd, "w", encoding="utf-8") as lock_handle:
-        lock_handle.write(f"pid={os.getpid()} started={timestamp()}\n")
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def acquire_lock() -> None:
+    global _lock_fd
+    # The OS drops the advisory lock when the holder exits, so a lock file left
+    # behind by a crashed run never blocks the next one. A held lock always means
+    # a live run; the file is never unlinked, so two runs can't lock different inodes.
+    fd = os.open(str(LOCK_PATH), os.O_CREAT | os.O_RDWR, 0o644)
+    if not _try_lock_fd(fd):
+        os.close(fd)
+        raise LockHeldError(
+            f"Lock file exists at {LOCK_PATH}. Another run may still be active."
+        )
+
+    os.ftruncate(fd, 0)
+    os.write(fd, f"pid={os.getpid()} started={timestamp()}\n".encode("utf-8"))
+    _lock_fd = fd
 
 
 def release_lock() -> None:
-    LOCK_PATH.unlink(missing_ok=True)
+    global _lock_fd
+    if _lock_fd is None:
+        return
+    fd, _lock_fd = _lock_fd, None
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
 
 
 def parse_args() -> argparse.Namespace:
@@ -707,16 +906,17 @@ def parse_args() -> argparse.Namespace:
         help="Timeout for the Codex command.",
     )
     parser.add_argument(
-        "--stale-lock-minutes",
+        "--batch-size",
         type=int,
-        default=120,
-        help="Consider lock stale after this many minutes.",
+        default=1,
+        help="Number of profiles to generate before inserting them with one PHP call.",
     )
     parser.add_argument(
         "--log-file",
         default=str(DEFAULT_LOG_FILE),
         help="Path for run logs.",
     )
+    parser.add_argument("--verbose", action="store_true", help="Log full tracebacks for failed runs.")
     return parser.parse_args()
 
 
@@ -728,75 +928,99 @@ def main() -> int:
     if not SCHEMA_PATH.exists():
         write_log(f"Schema not found: {SCHEMA_PATH}", log_file)
         return 1
-    if not PHP_LIST_TITLES.exists() or not PHP_LIST_CANDIDATES.exists() or not PHP_INSERT_POST.exists():
+    if not PHP_BOOTSTRAP_DATA.exists() or not PHP_INSERT_POST.exists():
         write_log("PHP helper scripts are missing.", log_file)
         return 1
 
     try:
-        acquire_lock(args.stale_lock_minutes)
+        acquire_lock()
         lock_acquired = True
         write_log("Job started.", log_file)
 
-        existing_titles = get_existing_titles()
-        write_log(f"Loaded {len(existing_titles)} existing post title(s).", log_file)
-        existing_candidates = get_existing_candidates()
-        write_log(f"Loaded {len(existing_candidates)} existing candidate profile(s).", log_file)
-
-        prompt = build_prompt(
-            topic=args.topic,
-            existing_titles=existing_titles,
-            existing_candidates=existing_candidates,
-            min_sources=args.min_sources,
-            min_confidence=args.min_confidence,
-        )
-        write_log("Starting Codex research step.", log_file)
-
-        with tempfile.TemporaryDirectory(prefix="cyber_autopost_") as temp_dir:
-            output_path = Path(temp_dir) / "codex_response.json"
-            payload = run_codex(
-                prompt,
-                output_path,
-                args.model,
-                timeout_seconds=args.codex_timeout_seconds,
+        corpus = build_existing_corpus(*get_existing_data())
+        write_log(f"Loaded {len(corpus.titles)} existing post title(s).", log_file)
+        write_log(f"Loaded {len(corpus.candidates)} existing candidate profile(s).", log_file)
+
+        batch_size = max(args.batch_size, 1)
+        exit_code = 0
+        pending: list[dict[str, Any]] = []
+        for attempt in range(1, batch_size + 1):
+            prompt = build_prompt(
+                topic=args.topic,
+                corpus=corpus,
+                min_sources=args.min_sources,
+                min_confidence=args.min_confidence,
             )
-        write_log("Codex research step completed.", log_file)
-        payload = normalize_seo_fields(payload)
-
-        debug_file = save_debug_payload(payload)
-        write_log(f"Saved AI payload to {debug_file}.", log_file)
-
-        errors = validate_payload(
-            payload,
-            existing_titles=existing_titles,
-            existing_candidates=existing_candidates,
-            min_sources=args.min_sources,
-            min_confidence=args.min_confidence,
-        )
-        if errors:
-            write_log("Validation failed; skipping publish.", log_file)
-            for err in errors:
-                write_log(f" - {err}", log_file)
-            return 2
+            write_log(f"Starting Codex research step ({attempt}/{batch_size}).", log_file)
 
-        if payload.get("status") == "skip":
-            write_log(f"Model returned skip: {payload.get('reason', 'no reason')}", log_file)
-            return 0
+            try:
+                payload = run_codex(
+                    prompt,
+                    args.model,
+                    timeout_seconds=args.codex_timeout_seconds,
+                )
+            except Exception as exc:
+                if not pending:
+                    raise
+                # Keep the profiles already validated in this batch; they are published below.
+                write_log(f"Codex research step failed: {exc!r}", log_file)
+                if args.verbose:
+                    log_traceback(exc, log_file)
+                exit_code = 1
+                break
+            write_log("Codex research step completed.", log_file)
+            payload = normalize_seo_fields(payload)
+
+            debug_file = save_debug_payload(payload)
+            write_log(f"Saved AI payload to {debug_file}.", log_file)
+
+            errors = validate_payload(
+                payload,
+                corpus=corpus,
+                min_sources=args.min_sources,
+                min_confidence=args.min_confidence,
+            )
+            if errors:
+                write_log("Validation failed; skipping publish.", log_file)
+                for err in errors:
+                    write_log(f" - {err}", log_file)
+                exit_code = 2
+                continue
+
+            if payload.get("status") == "skip":
+                write_log(f"Model returned skip: {payload.get('reason', 'no reason')}", log_file)
+                continue
+
+            pending.append(payload)
+            # Later prompts in the batch must not pick the same candidate or topic again.
+            corpus = extend_existing_corpus(
+                corpus,
+                str(payload["title"]).strip(),
+                normalize_ws(payload["candidate_profile"].get("candidate_name", "")),
+            )
+
+        if not pending:
+            return exit_code
 
         if args.dry_run:
-            write_log("Dry-run enabled; not publishing post.", log_file)
-            return 0
+            write_log(f"Dry-run enabled; not publishing {len(pending)} post(s).", log_file)
+            return exit_code
 
-        result = insert_post(payload, post_status=args.post_status)
-        write_log(f"Insert result: {json.dumps(result, ensure_ascii=False)}", log_file)
-        return 0
+        for result in insert_posts(pending, post_status=args.post_status):
+            write_log(f"Insert result: {json.dumps(result, ensure_ascii=False)}", log_file)
+            # The batch endpoint reports per-post errors in its results instead of exiting non-zero.
+            if result.get("status") == "error":
+                write_log(f"Insert failed: {result.get('reason', 'unknown error')}", log_file)
+                exit_code = 1
+        return exit_code
 
     except LockHeldError as exc:
         write_log(f"Skipping run: {exc}", log_file)
         return 0
     except Exception as exc:
-        write_log(f"Job failed: {exc}", log_file)
-        for line in traceback.format_exc().splitlines():
-            write_log(line, log_file)
+        write_log(f"Job failed: {exc!r}", log_file)
+        if args.verbose:
+            log_traceback(exc, log_file)
         return 1
     finally:
         if lock_acquired:
@@ -2,18 +2,22 @@
 from __future__ import annotations
 
 import argparse
-import datetime as dt
+import functools
+import hashlib
 import html
 import json
+import logging
 import os
+import queue
+import random
 import re
 import subprocess
 import sys
-import traceback
+import threading
 import time
 from pathlib import Path
-from typing import Any
-from urllib.parse import urlparse
+from typing import Any, Callable
+from urllib.parse import urlsplit
 
 # New SDK Import
 try:
@@ -24,72 +28,331 @@ except ImportError:
     print("Error: 'google-genai' library is missing. Install via: pip install google-genai")
     sys.exit(1)
 
-ROOT_DIR = Path(__file__).resolve().parents[1]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 AUTOMATION_DIR = Path(__file__).resolve().parent
+ROOT_DIR = AUTOMATION_DIR.parent
 SCHEMA_PATH = AUTOMATION_DIR / "codex_cybersecurity_schema.json"
-PHP_LIST_TITLES = AUTOMATION_DIR / "wp_get_post_titles.php"
-PHP_LIST_CANDIDATES = AUTOMATION_DIR / "wp_get_profile_candidates.php"
-PHP_INSERT_POST = AUTOMATION_DIR / "wp_insert_post.php"
+PHP_WORKER = AUTOMATION_DIR / "wp_worker.php"
 LOCK_PATH = AUTOMATION_DIR / "gemini_autopost.lock"
 LOG_DIR = AUTOMATION_DIR / "logs"
 DEFAULT_LOG_FILE = LOG_DIR / "gemini_autopost.log"
-
-STOPWORDS = {
+RATE_LIMIT_PATH = AUTOMATION_DIR / ".gemini_ratelimit.json"
+RATE_LIMIT_LOCK_PATH = AUTOMATION_DIR / ".gemini_ratelimit.lock"
+MAX_BACKOFF_SECONDS = 3600
+WP_CACHE_TTL_SECONDS = 900
+WP_WORKER_TIMEOUT_SECONDS = 300
+# Candidates are the dedupe key and are also written by cybersecurity_autopost.py,
+# so only the titles (used to steer the prompt) are cached.
+WP_CACHED_OPS = ("titles",)
+
+# Plain-string forms of the paths handed to subprocess and cache keys, converted once at import.
+_STR_ROOT = os.fspath(ROOT_DIR)
+_STR_WORKER = os.fspath(PHP_WORKER)
+_STR_SCHEMA = os.fspath(SCHEMA_PATH)
+
+LOG_DIR.mkdir(parents=True, exist_ok=True)
+logger = logging.getLogger("gemini_autopost")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_formatter = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+for _handler in (
+    logging.FileHandler(DEFAULT_LOG_FILE, encoding="utf-8", delay=True),
+    logging.StreamHandler(sys.stdout),
+):
+    _handler.setFormatter(_log_formatter)
+    logger.addHandler(_handler)
+
+_WS_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
     "about", "after", "again", "against", "also", "and", "are", "been",
     "before", "being", "between", "could", "during", "from", "have", "into",
     "more", "most", "over", "that", "their", "them", "then", "there", "these",
     "they", "this", "through", "under", "using", "what", "when", "where",
     "which", "with", "your",
-}
+})
+
+UNSUPPORTED_SCHEMA_KEYS = ("$schema", "title", "additionalProperties", "definitions")
 
 class LockHeldError(RuntimeError):
     pass
 
-def timestamp() -> str:
-    return dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def json_loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dump_bytes(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+def write_log(message: str) -> None:
+    # One persistent file handle via the module logger instead of open/append/close per line.
+    logger.info(message)
+
+_lock_fd: int | None = None
 
-def write_log(message: str, log_file: Path) -> None:
-    line = f"[{timestamp()}] {message}"
-    print(line, flush=True)
-    log_file.parent.mkdir(parents=True, exist_ok=True)
+def _try_lock_fd(fd: int) -> bool:
     try:
-        with log_file.open("a", encoding="utf-8") as handle:
-            handle.write(line + "\n")
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+def acquire_lock() -> None:
+    # Same advisory lock as cybersecurity_autopost.py: the OS releases it when the
+    # holder exits, so there is no stale-lock detection and no file to race over.
+    global _lock_fd
+    fd = os.open(str(LOCK_PATH), os.O_CREAT | os.O_RDWR, 0o644)
+    if not _try_lock_fd(fd):
+        os.close(fd)
+        raise LockHeldError(f"Lock file exists at {LOCK_PATH}. Another run may still be active.")
+    os.ftruncate(fd, 0)
+    os.write(fd, f"{os.getpid()}\n".encode("utf-8"))
+    _lock_fd = fd
+
+def release_lock() -> None:
+    # The file itself stays; unlinking it would let a waiting run lock an orphaned inode.
+    global _lock_fd
+    if _lock_fd is None:
+        return
+    fd, _lock_fd = _lock_fd, None
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+class WPWorker:
+    """One PHP process that loads WordPress once and answers newline-delimited JSON requests.
+
+    The process is started on the first call. A call that gets no answer within
+    timeout_seconds kills the process; the next call starts a fresh one.
+    """
+
+    def __init__(self, args: list[str] | None = None, timeout_seconds: float = WP_WORKER_TIMEOUT_SECONDS) -> None:
+        self.args = args or ["php", _STR_WORKER]
+        self.timeout_seconds = timeout_seconds
+        self.process: subprocess.Popen | None = None
+        self.lines: queue.Queue[bytes] = queue.Queue()
+
+    def _start(self) -> subprocess.Popen:
+        self.process = subprocess.Popen(
+            self.args,
+            cwd=_STR_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        # select() can't wait on pipes on Windows, so a reader thread feeds a queue that call() waits on.
+        self.lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.process.stdout, self.lines), daemon=True).start()
+        return self.process
+
+    @staticmethod
+    def _read_lines(stream: Any, lines: queue.Queue[bytes]) -> None:
+        with stream:
+            for line in iter(stream.readline, b""):
+                lines.put(line)
+        lines.put(b"")
+
+    def _kill(self) -> None:
+        process, self.process = self.process, None
+        if process is None:
+            return
+        process.kill()
+        process.wait()
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+    def call(self, op: str, **kw: Any) -> Any:
+        process = self.process or self._start()
+        try:
+            process.stdin.write(json_dump_bytes({"op": op, **kw}) + b"\n")
+            process.stdin.flush()
+            line = self.lines.get(timeout=self.timeout_seconds)
+        except queue.Empty:
+            self._kill()
+            raise RuntimeError(f"WordPress worker gave no answer to '{op}' within {self.timeout_seconds}s; killed it.")
+        except OSError:
+            line = b""
+        if not line:
+            code = process.wait()
+            self._kill()
+            raise RuntimeError(f"WordPress worker exited with code {code} during '{op}'.")
+        resp = json_loads(line)
+        if not resp.get("ok"):
+            raise RuntimeError(f"WordPress worker '{op}' failed: {resp.get('error')}")
+        return resp.get("result")
+
+    def close(self) -> None:
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+def _wp_cache_path(name: str) -> Path:
+    return AUTOMATION_DIR / f".cache_{name}.json"
+
+def cached_php(wp: WPWorker, name: str, *, ttl: float = WP_CACHE_TTL_SECONDS, refresh: bool = False) -> Any:
+    # Titles change slowly; reuse the last answer for up to ttl seconds.
+    path = _wp_cache_path(name)
+    if not refresh:
+        try:
+            if time.time() - path.stat().st_mtime < ttl:
+                return json_loads(path.read_bytes())
+        except (OSError, ValueError):
+            pass
+    data = wp.call(name)
+    try:
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(json_dump_bytes(data))
+        os.replace(tmp_path, path)
     except OSError:
         pass
+    return data
 
-def run_command(args: list[str], *, stdin_text: str | None = None) -> str:
-    process = subprocess.Popen(
-        args,
-        cwd=str(ROOT_DIR),
-        stdin=subprocess.PIPE if stdin_text else None,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    stdout, stderr = process.communicate(input=stdin_text)
-    if process.returncode != 0:
-        raise RuntimeError(f"Command failed:\n{stderr}")
-    return stdout.strip()
+def invalidate_php_cache() -> None:
+    for name in WP_CACHED_OPS:
+        _wp_cache_path(name).unlink(missing_ok=True)
 
 def sanitize_schema(schema: dict) -> dict:
     """
-    Recursively removes keys from the JSON schema that the Gemini API does not support.
+    Removes keys from the JSON schema that the Gemini API does not support.
     Specifically: $schema, title, additionalProperties (if boolean), etc.
+    The schema is modified in place (it is loaded fresh and cached by _load_clean_schema).
     """
-    if not isinstance(schema, dict):
-        return schema
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        for key in UNSUPPORTED_SCHEMA_KEYS:
+            node.pop(key, None)
+        props = node.get("properties")
+        if isinstance(props, dict):
+            stack.extend(props.values())
+        items = node.get("items")
+        if items is not None:
+            stack.append(items)
+    return schema
+
+@functools.lru_cache(maxsize=4)
+def _load_clean_schema(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return sanitize_schema(json.load(f))
+
+@functools.lru_cache(maxsize=4)
+def _get_payload_validator(path: str) -> Any:
+    # Same sanitized schema Gemini is given, so a reply that honours response_schema passes.
+    if fastjsonschema is None:
+        return None
+    return fastjsonschema.compile(_load_clean_schema(path))
+
+@functools.lru_cache(maxsize=2)
+def _get_client(api_key: str) -> genai.Client:
+    return genai.Client(api_key=api_key)
+
+@functools.lru_cache(maxsize=4)
+def _get_config(schema_path: str) -> types.GenerateContentConfig:
+    google_search_tool = types.Tool(
+        google_search=types.GoogleSearch()
+    )
+
+    return types.GenerateContentConfig(
+        tools=[google_search_tool],
+        response_mime_type="application/json",
+        response_schema=_load_clean_schema(schema_path),
+        temperature=0.3
+    )
 
-    clean = schema.copy()
-    for key in ["$schema", "title", "additionalProperties", "definitions"]:
-        clean.pop(key, None)
+def _retry_after_seconds(exc: Exception) -> float | None:
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        retry_after = headers.get("Retry-After")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        # HTTP-date form of Retry-After; fall back to the computed backoff.
+        return None
 
-    if "properties" in clean:
-        clean["properties"] = {k: sanitize_schema(v) for k, v in clean["properties"].items()}
-    if "items" in clean:
-        clean["items"] = sanitize_schema(clean["items"])
+def _read_rate_limit_state() -> dict[str, float]:
+    try:
+        with RATE_LIMIT_PATH.open("r", encoding="utf-8") as f:
+            state = json.load(f)
+        return {
+            "next_ok_ts": float(state.get("next_ok_ts", 0)),
+            "backoff": float(state.get("backoff", 0)),
+        }
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {"next_ok_ts": 0.0, "backoff": 0.0}
+
+def _update_rate_limit_state(update: Callable[[dict[str, float]], None]) -> None:
+    # Shared by every cron run; the sidecar lock serializes writers and
+    # os.replace keeps readers from ever seeing a partial file. update() sees
+    # the state as stored now, not the snapshot this run started from.
+    try:
+        with RATE_LIMIT_LOCK_PATH.open("a") as lock_handle:
+            if fcntl is not None:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            state = _read_rate_limit_state()
+            update(state)
+            tmp_path = RATE_LIMIT_PATH.with_name(f"{RATE_LIMIT_PATH.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp_path, RATE_LIMIT_PATH)
+    except OSError:
+        pass
 
-    return clean
+def _record_rate_limit(next_ok_ts: float, backoff: float) -> None:
+    def update(state: dict[str, float]) -> None:
+        # Never shorten a cooldown another run recorded in the meantime.
+        state["next_ok_ts"] = max(state["next_ok_ts"], next_ok_ts)
+        state["backoff"] = max(state["backoff"], backoff)
+    _update_rate_limit_state(update)
+
+def _relax_rate_limit() -> None:
+    def update(state: dict[str, float]) -> None:
+        # A cooldown still in the future was set by another run's 429 after we started; keep it.
+        if state["next_ok_ts"] > time.time():
+            return
+        backoff = state["backoff"] / 2
+        state["next_ok_ts"] = 0.0
+        state["backoff"] = backoff if backoff >= 1 else 0.0
+    _update_rate_limit_state(update)
 
 def run_gemini(
     prompt: str,
@@ -98,46 +361,51 @@ def run_gemini(
     schema_path: Path,
 ) -> dict[str, Any]:
 
-    with schema_path.open("r", encoding="utf-8") as f:
-        raw_schema = json.load(f)
+    rate_limit = _read_rate_limit_state()
+    remaining = rate_limit["next_ok_ts"] - time.time()
+    if remaining > 0:
+        return {"status": "skip", "reason": f"client-side rate limit ({remaining:.0f}s remaining)"}
 
-    clean_schema = sanitize_schema(raw_schema)
-    client = genai.Client(api_key=api_key)
-
-    google_search_tool = types.Tool(
-        google_search=types.GoogleSearch()
-    )
-
-    config = types.GenerateContentConfig(
-        tools=[google_search_tool],
-        response_mime_type="application/json",
-        response_schema=clean_schema,
-        temperature=0.3
-    )
+    client = _get_client(api_key)
+    config = _get_config(str(schema_path))
 
     # --- RETRY LOGIC ADDED HERE ---
-    max_retries = 3
+    max_retries = 5
     base_wait = 30 # Seconds
 
     for attempt in range(max_retries):
         try:
-            response = client.models.generate_content(
+            parts = []
+            for chunk in client.models.generate_content_stream(
                 model=model_name,
                 contents=prompt,
                 config=config
-            )
+            ):
+                if chunk.text:
+                    parts.append(chunk.text)
+            text = "".join(parts)
 
-            if not response.text:
+            if not text:
                 raise ValueError("Gemini returned empty text (safety block?).")
 
-            return json.loads(response.text)
+            if rate_limit["backoff"] > 0:
+                _relax_rate_limit()
+            return json.loads(text)
 
         except errors.ClientError as e:
             # Check for Rate Limit (429)
             if e.code == 429:
+                # Exponential backoff with full jitter so concurrent jobs don't retry in lockstep;
+                # a server-provided Retry-After is treated as the minimum wait.
+                backoff = min(max(base_wait * (2 ** attempt), rate_limit["backoff"]), MAX_BACKOFF_SECONDS)
+                wait_time = random.uniform(0, backoff)
+                retry_after = _retry_after_seconds(e)
+                if retry_after is not None:
+                    wait_time = max(wait_time, retry_after)
+                rate_limit["backoff"] = backoff
+                _record_rate_limit(time.time() + wait_time, backoff)
                 if attempt < max_retries - 1:
-                    wait_time = base_wait * (attempt + 1)
-                    print(f"[{timestamp()}] Rate limit hit (429). Waiting {wait_time}s before retry {attempt+2}/{max_retries}...")
+                    write_log(f"Rate limit hit (429). Waiting {wait_time:.1f}s before retry {attempt+2}/{max_retries}...")
                     time.sleep(wait_time)
                     continue
                 else:
@@ -148,13 +416,11 @@ def run_gemini(
         except Exception as e:
              raise RuntimeError(f"Gemini unexpected error: {e}")
 
-def domain_from_url(url: str) -> str:
-    parsed = urlparse(str(url or "").strip())
-    host = parsed.netloc.lower().strip()
-    return host[4:] if host.startswith("www.") else host
+def domain_from_url(url: Any) -> str:
+    return urlsplit(str(url or "").strip()).netloc.lower().strip().removeprefix("www.")
 
 def normalize_ws(text: str) -> str:
-    return re.sub(r"\s+", " ", str(text or "")).strip()
+    return _WS_RE.sub(" ", str(text or "")).strip()
 
 def trim_to_max_chars(text: str, max_chars: int) -> str:
     text = normalize_ws(text)
@@ -162,7 +428,7 @@ def trim_to_max_chars(text: str, max_chars: int) -> str:
     return text[:max_chars].rsplit(" ", 1)[0].rstrip(" ,;:-")
 
 def trim_slug(slug: str) -> str:
-    return "-".join(re.findall(r"[a-z0-9]+", normalize_ws(slug).lower()))[:120].strip("-")
+    return "-".join(_TOKEN_RE.findall(normalize_ws(slug).lower()))[:120].strip("-")
 
 def normalize_seo_fields(payload: dict) -> dict:
     if payload.get("status") != "publish": return payload
@@ -171,9 +437,13 @@ def normalize_seo_fields(payload: dict) -> dict:
     payload["slug"] = trim_slug(payload.get("slug", "") or seo["focus_keyphrase"])
     return payload
 
+def dedupe_names(items: list) -> list[str]:
+    # Order-preserving; drops blanks and repeats so the prompt carries no wasted tokens.
+    return list(dict.fromkeys(s for s in (str(item or "").strip() for item in items) if s))
+
 def build_prompt(topic, titles, candidates, min_sources, min_confidence) -> str:
-    t_list = "\n".join(f"- {t}" for t in titles[:300]) or "- (none)"
-    c_list = "\n".join(f"- {c}" for c in candidates[:300]) or "- (none)"
+    t_list = "\n".join("- " + t for t in titles[:300]) or "- (none)"
+    c_list = "\n".join("- " + c for c in candidates[:300]) or "- (none)"
     return (
         f"Role: Expert Political Researcher.\nTopic: {topic}\nTarget Date: 2026-03-05\n\n"
         "TASK: Research ONE real candidate for the 2026 Nepal Election. Create a profile JSON.\n"
@@ -188,14 +458,21 @@ def build_prompt(topic, titles, candidates, min_sources, min_confidence) -> str:
         f"6. Confidence must be >= {min_confidence}."
     )
 
-def validate_payload(payload, titles, candidates, min_sources) -> list[str]:
+def validate_payload(payload, titles, cands_lower, min_sources) -> list[str]:
     errs = []
     if payload.get("status") == "skip":
         if not payload.get("reason"): errs.append("Skip reason missing")
         return errs
 
+    validator = _get_payload_validator(_STR_SCHEMA)
+    if validator is not None:
+        try:
+            validator(payload)
+        except fastjsonschema.JsonSchemaException as e:
+            errs.append(f"Schema: {e.message}")
+
     cand_name = payload.get("candidate_profile", {}).get("candidate_name", "").lower()
-    if any(cand_name in c.lower() for c in candidates):
+    if any(cand_name in c for c in cands_lower):
         errs.append("Candidate already exists")
 
     srcs = payload.get("sources", [])
@@ -204,10 +481,16 @@ def validate_payload(payload, titles, candidates, min_sources) -> list[str]:
 
     return errs
 
-def insert_post(payload: dict, status: str) -> dict:
+def idempotency_key(payload: dict) -> str:
+    # Keyed on who the profile is about; Gemini rewrites every field on a retry.
+    name = " ".join(_TOKEN_RE.findall(str(payload.get("candidate_profile", {}).get("candidate_name", "")).lower()))
+    identity = f"candidate:{name}" if name else f"slug:{trim_slug(payload.get('slug', ''))}"
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=16).hexdigest()
+
+def insert_post(wp: WPWorker, payload: dict, status: str) -> dict:
     payload["post_status"] = status
-    stdout = run_command(["php", str(PHP_INSERT_POST)], stdin_text=json.dumps(payload))
-    return json.loads(stdout)
+    payload["idempotency_key"] = idempotency_key(payload)
+    return wp.call("insert", payload=payload)
 
 def main() -> int:
     parser = argparse.ArgumentParser()
@@ -216,53 +499,86 @@ def main() -> int:
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--model", default="gemini-2.0-flash")
     parser.add_argument("--min-sources", type=int, default=8)
+    parser.add_argument("--max-prompt-tokens", type=int, default=12000)
+    parser.add_argument("--refresh-cache", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
 
     args = parser.parse_args()
-    log_file = Path(DEFAULT_LOG_FILE)
 
     if not args.api_key:
         print("Error: --api-key required")
         return 1
 
-    write_log("Job started.", log_file)
+    lock_acquired = False
+    wp = None
     try:
+        acquire_lock()
+        lock_acquired = True
+        write_log("Job started.")
+
         # 1. Get WordPress Data
-        titles = json.loads(run_command(["php", str(PHP_LIST_TITLES)]))
-        cands = json.loads(run_command(["php", str(PHP_LIST_CANDIDATES)]))
+        # A single worker process bootstraps WordPress once for the reads and the insert.
+        wp = WPWorker()
+        titles = dedupe_names(cached_php(wp, "titles", refresh=args.refresh_cache))
+        cands = dedupe_names(wp.call("candidates"))
+        cands_lower = [c.lower() for c in cands]
 
         # 2. Build Prompt
-        prompt = build_prompt("Nepal election candidate", titles, cands, args.min_sources, 85)
+        topic = "Nepal election candidate"
+        prompt = build_prompt(topic, titles, cands, args.min_sources, 85)
+        # Rough 4-chars-per-token estimate; oversized prompts are slow and more likely to hit 429.
+        approx_tokens = len(prompt) // 4
+        if approx_tokens > args.max_prompt_tokens:
+            write_log(f"Prompt too large (~{approx_tokens} tokens), trimming")
+            prompt = build_prompt(topic, titles[:100], cands[:100], args.min_sources, 85)
+            approx_tokens = len(prompt) // 4
+            if approx_tokens > args.max_prompt_tokens:
+                write_log(f"Skipped: prompt still ~{approx_tokens} tokens (budget {args.max_prompt_tokens})")
+                return 0
 
         # 3. Run Gemini (With Retry)
-        write_log(f"Querying {args.model}...", log_file)
+        write_log(f"Querying {args.model}...")
         payload = run_gemini(prompt, args.api_key, args.model, SCHEMA_PATH)
 
         # 4. Normalize & Validate
         payload = normalize_seo_fields(payload)
-        errs = validate_payload(payload, titles, cands, args.min_sources)
+        errs = validate_payload(payload, titles, cands_lower, args.min_sources)
 
         if errs:
-            write_log(f"Validation failed: {errs}", log_file)
+            write_log(f"Validation failed: {errs}")
             return 1
 
         if payload.get("status") == "skip":
-            write_log(f"Skipped: {payload.get('reason')}", log_file)
+            write_log(f"Skipped: {payload.get('reason')}")
             return 0
 
         # 5. Insert or Dry Run
         if args.dry_run:
-            write_log("Dry run success. Payload valid.", log_file)
+            write_log("Dry run success. Payload valid.")
             debug_path = LOG_DIR / "debug_payload.json"
             with debug_path.open("w", encoding="utf-8") as f:
                 json.dump(payload, f, indent=2)
             print(f"Debug payload saved to {debug_path}")
         else:
-            res = insert_post(payload, args.post_status)
-            write_log(f"Published: {res}", log_file)
+            res = insert_post(wp, payload, args.post_status)
+            invalidate_php_cache()
+            write_log(f"Published: {res}")
 
+    except LockHeldError as e:
+        write_log(f"Skipping run: {e}")
+        return 0
     except Exception as e:
-        write_log(f"Error: {e}\n{traceback.format_exc()}", log_file)
+        write_log(f"Job failed: {e!r}")
+        if args.verbose:
+            import traceback
+            for line in traceback.format_exception(e):
+                write_log(line.rstrip())
         return 1
+    finally:
+        if wp is not None:
+            wp.close()
+        if lock_acquired:
+            release_lock()
 
     return 0
 
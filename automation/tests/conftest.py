@@ -0,0 +1,29 @@
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# gemini_autopost exits at import time without google-genai. The tests never reach
+# the API, so a bare stand-in lets them import the module where the SDK isn't installed.
+try:
+    from google import genai  # noqa: F401
+except ImportError:
+    google = sys.modules.setdefault("google", types.ModuleType("google"))
+    genai = types.ModuleType("google.genai")
+    genai.types = types.ModuleType("google.genai.types")
+    genai.errors = types.ModuleType("google.genai.errors")
+
+    class ClientError(Exception):
+        def __init__(self, code: int, response_json: dict | None = None, response: object = None) -> None:
+            super().__init__(f"{code} {response_json}")
+            self.code = code
+            self.response = response
+
+    genai.errors.ClientError = ClientError
+    google.genai = genai
+    sys.modules.update({
+        "google.genai": genai,
+        "google.genai.types": genai.types,
+        "google.genai.errors": genai.errors,
+    })
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cybersecurity_autopost as autopost  # noqa: E402
+
+
+@pytest.fixture
+def job(tmp_path, monkeypatch):
+    log_file = tmp_path / "job.log"
+    monkeypatch.setattr(autopost, "LOCK_PATH", tmp_path / "job.lock")
+    monkeypatch.setattr(autopost, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(autopost, "get_existing_data", lambda: (["Old post"], ["Someone Else"]))
+
+    def fail_insert(*args, **kwargs):
+        raise AssertionError("nothing should be inserted")
+
+    monkeypatch.setattr(autopost, "insert_posts", fail_insert)
+
+    def run(*extra_args: str) -> tuple[int, str]:
+        monkeypatch.setattr(sys, "argv", ["cybersecurity_autopost.py", "--log-file", str(log_file), *extra_args])
+        exit_code = autopost.main()
+        return exit_code, log_file.read_text(encoding="utf-8")
+
+    return run
+
+
+def _codex_timeout(*args, **kwargs):
+    raise RuntimeError("Command timed out after 900 seconds: codex exec")
+
+
+def test_codex_failure_with_nothing_pending_reaches_outer_handler(job, monkeypatch):
+    monkeypatch.setattr(autopost, "run_codex", _codex_timeout)
+
+    exit_code, log = job()
+
+    assert exit_code == 1
+    assert "Job failed: RuntimeError('Command timed out after 900 seconds: codex exec')" in log
+    assert "Codex research step failed" not in log
+    assert "Traceback" not in log
+
+
+def test_codex_failure_traceback_logged_with_verbose(job, monkeypatch):
+    monkeypatch.setattr(autopost, "run_codex", _codex_timeout)
+
+    exit_code, log = job("--verbose")
+
+    assert exit_code == 1
+    assert "Job failed:" in log
+    assert "Traceback (most recent call last):" in log
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cybersecurity_autopost as autopost  # noqa: E402
+
+
+WORDS = "Nepal election candidate profile " * 10
+
+
+@pytest.mark.parametrize(("min_chars", "max_chars"), [(45, 65), (130, 170)])
+@pytest.mark.parametrize("fallback", ["", "Fallback Title", "x" * 200])
+def test_result_length_stays_within_bounds(min_chars: int, max_chars: int, fallback: str) -> None:
+    for length in range(min_chars + 30):
+        result = autopost.expand_to_min_chars(WORDS[:length], min_chars, max_chars, fallback)
+        assert min_chars <= len(result) <= max_chars, (length, result)
+        assert result == result.strip()
+        assert result[-1] not in ",;:-"
+
+
+def test_empty_text_reaches_min_chars() -> None:
+    result = autopost.expand_to_min_chars("", 45, 65, "")
+    assert 45 <= len(result) <= 65
+
+
+def test_overlong_text_trimmed_below_min_is_topped_up() -> None:
+    text = "a" * 30 + " " + "b" * 40
+    result = autopost.expand_to_min_chars(text, 45, 65, "")
+    assert result.startswith("a" * 30)
+    assert 45 <= len(result) <= 65
+
+
+def test_text_already_in_range_is_unchanged() -> None:
+    text = WORDS[:50].strip()
+    assert autopost.expand_to_min_chars(text, 45, 65, "ignored fallback") == text
+
+
+def test_meta_description_meets_validation_minimum() -> None:
+    payload = {
+        "status": "publish",
+        "title": "Candidate Profile",
+        "excerpt": "Short excerpt.",
+        "slug": "candidate-profile",
+        "seo": {"focus_keyphrase": "candidate profile", "meta_description": "Candidate profile summary."},
+    }
+    seo = autopost.normalize_seo_fields(payload)["seo"]
+    assert 130 <= len(seo["meta_description"]) <= 170
+    assert 45 <= len(seo["meta_title"]) <= 65
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+
+import pytest
+
+import gemini_autopost as gemini
+
+
+@pytest.fixture
+def lock_path(tmp_path, monkeypatch):
+    path = tmp_path / "gemini_autopost.lock"
+    monkeypatch.setattr(gemini, "LOCK_PATH", path)
+    yield path
+    gemini.release_lock()
+
+
+@pytest.fixture
+def rate_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(gemini, "RATE_LIMIT_PATH", tmp_path / ".gemini_ratelimit.json")
+    monkeypatch.setattr(gemini, "RATE_LIMIT_LOCK_PATH", tmp_path / ".gemini_ratelimit.lock")
+    return gemini._read_rate_limit_state
+
+
+def _hold_lock(path) -> int:
+    # A second open file description stands in for another run's process.
+    fd = os.open(str(path), os.O_CREAT | os.O_RDWR, 0o644)
+    assert gemini._try_lock_fd(fd)
+    return fd
+
+
+def test_lock_conflict_raises_until_holder_releases(lock_path):
+    fd = _hold_lock(lock_path)
+    try:
+        with pytest.raises(gemini.LockHeldError, match="Another run may still be active"):
+            gemini.acquire_lock()
+    finally:
+        os.close(fd)
+
+    gemini.acquire_lock()
+    assert lock_path.read_text(encoding="utf-8") == f"{os.getpid()}\n"
+    gemini.release_lock()
+    assert lock_path.exists()
+
+
+def test_main_skips_run_while_lock_is_held(lock_path, monkeypatch):
+    messages = []
+    monkeypatch.setattr(gemini, "write_log", messages.append)
+    monkeypatch.setattr(sys, "argv", ["gemini_autopost.py", "--api-key", "test-key"])
+
+    def no_worker(*args, **kwargs):
+        raise AssertionError("WordPress should not be touched")
+
+    monkeypatch.setattr(gemini, "WPWorker", no_worker)
+
+    fd = _hold_lock(lock_path)
+    try:
+        assert gemini.main() == 0
+    finally:
+        os.close(fd)
+    assert messages == [f"Skipping run: Lock file exists at {lock_path}. Another run may still be active."]
+
+
+def test_record_keeps_the_longer_cooldown(rate_limit):
+    now = time.time()
+    gemini._record_rate_limit(now + 600, 32)
+    gemini._record_rate_limit(now + 60, 4)
+    assert rate_limit() == {"next_ok_ts": now + 600, "backoff": 32}
+
+    gemini._record_rate_limit(now + 900, 8)
+    assert rate_limit() == {"next_ok_ts": now + 900, "backoff": 32}
+
+
+def test_relax_leaves_a_future_cooldown_alone(rate_limit):
+    until = time.time() + 600
+    gemini._record_rate_limit(until, 16)
+    gemini._relax_rate_limit()
+    assert rate_limit() == {"next_ok_ts": until, "backoff": 16}
+
+
+def test_relax_clears_an_expired_cooldown_and_halves_backoff(rate_limit):
+    gemini._record_rate_limit(time.time() - 1, 16)
+    gemini._relax_rate_limit()
+    assert rate_limit() == {"next_ok_ts": 0.0, "backoff": 8}
+
+    gemini._relax_rate_limit()
+    gemini._relax_rate_limit()
+    gemini._relax_rate_limit()
+    assert rate_limit() == {"next_ok_ts": 0.0, "backoff": 1}
+
+    gemini._relax_rate_limit()
+    assert rate_limit() == {"next_ok_ts": 0.0, "backoff": 0.0}
@@ -0,0 +1,76 @@
+import pytest
+
+import gemini_autopost as gemini
+
+pytest.importorskip("fastjsonschema")
+
+
+def _payload() -> dict:
+    sources = [
+        {
+            "url": f"https://news{i}.example.com/deuba",
+            "domain": f"news{i}.example.com",
+            "publisher": f"News {i}",
+            "published_date": "2025-11-01",
+            "why_reliable": "National daily with named reporters.",
+        }
+        for i in range(10)
+    ]
+    return {
+        "status": "publish",
+        "reason": "Candidate not yet profiled.",
+        "title": "Sher Bahadur Deuba Profile: Nepal 2026 Candidate",
+        "slug": "sher-bahadur-deuba-profile",
+        "excerpt": "Sher Bahadur Deuba profile for the Nepal General Election 2026.",
+        "topic_keywords": ["deuba", "nepali congress", "dadeldhura"],
+        "content_html": "<p>" + "Sher Bahadur Deuba profile. " * 80 + "</p>",
+        "candidate_profile": {
+            "candidate_name": "Sher Bahadur Deuba",
+            "election_name": "Nepal General Election 2026",
+            "election_date": "2026-03-05",
+            "party": "Nepali Congress",
+            "constituency": "Dadeldhura-1",
+            "current_position": "Party President",
+            "short_bio": "Five-time prime minister of Nepal.",
+            "profile_source_url": "https://news0.example.com/deuba",
+            "profile_image_url": "",
+            "profile_image_source_url": "",
+            "profile_image_credit": "",
+        },
+        "seo": {
+            "focus_keyphrase": "sher bahadur deuba profile",
+            "meta_title": "",
+            "meta_description": "",
+            "seo_slug_hint": "",
+        },
+        "sources": sources,
+        "key_facts": [
+            {
+                "fact": f"Fact number {i} about the candidate's record.",
+                "supporting_source_urls": ["https://news0.example.com/deuba", "https://news1.example.com/deuba"],
+                "confidence": 90,
+            }
+            for i in range(8)
+        ],
+    }
+
+
+def _schema_errors(payload: dict) -> list[str]:
+    errors = gemini.validate_payload(payload, titles=[], cands_lower=[], min_sources=10)
+    return [e for e in errors if e.startswith("Schema:")]
+
+
+def test_payload_matching_sanitized_schema_passes() -> None:
+    payload = _payload()
+    # The raw schema forbids extra properties; Gemini is never told that, so they must not fail the run.
+    payload["notes"] = "extra field"
+    payload["seo"]["schema_type"] = "Person"
+    payload["sources"][0]["language"] = "ne"
+    assert _schema_errors(payload) == []
+
+
+def test_constraints_kept_by_sanitizer_are_enforced() -> None:
+    payload = _payload()
+    payload["topic_keywords"] = ["deuba"]
+    del payload["key_facts"]
+    assert len(_schema_errors(payload)) == 1
@@ -0,0 +1,83 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+import gemini_autopost as gemini
+
+# Speaks wp_worker.php's protocol: one JSON request per stdin line, one JSON response per stdout line.
+FAKE_WORKER = textwrap.dedent(
+    """
+    import json, os, sys, time
+
+    for line in sys.stdin:
+        req = json.loads(line)
+        op = req["op"]
+        if op == "titles":
+            resp = {"ok": True, "result": ["First", "Second"]}
+        elif op == "pid":
+            resp = {"ok": True, "result": os.getpid()}
+        elif op == "insert":
+            resp = {"ok": True, "result": {"status": "created", "key": req["payload"]["idempotency_key"]}}
+        elif op == "hang":
+            time.sleep(60)
+            continue
+        elif op == "exit":
+            sys.exit(3)
+        else:
+            resp = {"ok": False, "error": "Unknown op: " + op}
+        sys.stdout.write(json.dumps(resp) + "\\n")
+        sys.stdout.flush()
+    """
+)
+
+
+@pytest.fixture
+def worker(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER, encoding="utf-8")
+    wp = gemini.WPWorker([sys.executable, os.fspath(script)], timeout_seconds=2)
+    yield wp
+    wp.close()
+
+
+def test_calls_share_one_process(worker):
+    assert worker.call("titles") == ["First", "Second"]
+    pid = worker.call("pid")
+    assert worker.call("pid") == pid
+    assert worker.process.pid == pid
+
+
+def test_insert_payload_round_trips(worker):
+    result = gemini.insert_post(worker, {"candidate_profile": {"candidate_name": "Balen Shah"}}, "draft")
+    assert result["status"] == "created"
+    assert result["key"] == gemini.idempotency_key({"candidate_profile": {"candidate_name": "balen shah"}})
+
+
+def test_error_response_raises(worker):
+    with pytest.raises(RuntimeError, match="'bogus' failed: Unknown op: bogus"):
+        worker.call("bogus")
+    assert worker.call("titles") == ["First", "Second"]
+
+
+def test_worker_exit_raises_and_next_call_restarts(worker):
+    pid = worker.call("pid")
+    with pytest.raises(RuntimeError, match="exited with code 3 during 'exit'"):
+        worker.call("exit")
+    assert worker.process is None
+    assert worker.call("pid") != pid
+
+
+def test_hung_worker_is_killed_after_timeout(worker):
+    worker.timeout_seconds = 0.5
+    hung = worker.call("pid") and worker.process
+    with pytest.raises(RuntimeError, match="no answer to 'hang'"):
+        worker.call("hang")
+    assert hung.poll() is not None
+    assert worker.process is None
+    assert worker.call("titles") == ["First", "Second"]
+
+
+def test_close_without_calls_is_a_no_op():
+    gemini.WPWorker().close()
@@ -0,0 +1,36 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cybersecurity_autopost as autopost  # noqa: E402
+
+
+def _payload(candidate_name: str, title: str, content: str, slug: str = "profile") -> dict:
+    return {
+        "title": title,
+        "slug": slug,
+        "content_html": content,
+        "candidate_profile": {"candidate_name": candidate_name},
+    }
+
+
+def test_regenerated_profile_of_same_candidate_keeps_key() -> None:
+    first = _payload("Balen Shah", "Balen Shah Profile", "<p>First draft.</p>", "balen-shah-profile")
+    retry = _payload("  balen   SHAH ", "Who Is Balen Shah?", "<p>Rewritten.</p>", "who-is-balen-shah")
+    assert autopost.idempotency_key(first) == autopost.idempotency_key(retry)
+
+
+def test_different_candidates_get_different_keys() -> None:
+    assert autopost.idempotency_key(_payload("Balen Shah", "t", "c")) != autopost.idempotency_key(
+        _payload("Sher Bahadur Deuba", "t", "c")
+    )
+
+
+def test_missing_candidate_falls_back_to_slug() -> None:
+    assert autopost.idempotency_key(_payload("", "a", "x", "same-slug")) == autopost.idempotency_key(
+        _payload("", "b", "y", "same-slug")
+    )
+    assert autopost.idempotency_key(_payload("", "a", "x", "one-slug")) != autopost.idempotency_key(
+        _payload("", "a", "x", "other-slug")
+    )
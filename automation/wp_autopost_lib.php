@@ -0,0 +1,245 @@
+<?php
+declare(strict_types=1);
+
+/*
+ * Shared WordPress queries and post insertion for the autopost helpers.
+ * Functions only; callers load wp-load.php themselves.
+ */
+
+const SBLOGICAL_AUTOPOST_REQUIRED_FIELDS = array(
+	'title',
+	'slug',
+	'excerpt',
+	'content_html',
+	'post_status',
+	'topic_keywords',
+	'candidate_profile',
+	'seo',
+	'sources',
+	'category_name',
+);
+
+/**
+ * Returns the first required field missing from a post payload, or '' if none.
+ */
+function sblogical_autopost_missing_field(array $payload): string {
+	foreach (SBLOGICAL_AUTOPOST_REQUIRED_FIELDS as $key) {
+		if (! array_key_exists($key, $payload)) {
+			return $key;
+		}
+	}
+	return '';
+}
+
+/**
+ * Returns existing post titles, newest first, or null if the query fails.
+ */
+function sblogical_autopost_titles(): ?array {
+	global $wpdb;
+
+	$titles = $wpdb->get_col(
+		$wpdb->prepare(
+			"SELECT post_title
+			FROM {$wpdb->posts}
+			WHERE post_type = %s
+			  AND post_status IN ('publish', 'future', 'draft', 'pending', 'private', 'trash')
+			  AND post_title <> ''
+			ORDER BY post_date DESC",
+			'post'
+		)
+	);
+
+	return is_array($titles) ? array_values($titles) : null;
+}
+
+/**
+ * Returns candidate names already covered by autoposts, or null if the query fails.
+ */
+function sblogical_autopost_candidates(): ?array {
+	global $wpdb;
+
+	$candidates = $wpdb->get_col(
+		"SELECT DISTINCT pm.meta_value
+		FROM {$wpdb->postmeta} pm
+		INNER JOIN {$wpdb->posts} p ON p.ID = pm.post_id
+		WHERE pm.meta_key = '_sblogical_candidate_name'
+		  AND pm.meta_value <> ''
+		  AND p.post_type = 'post'
+		  AND p.post_status IN ('publish', 'future', 'draft', 'pending', 'private', 'trash')
+		ORDER BY pm.meta_value ASC"
+	);
+
+	return is_array($candidates) ? array_values($candidates) : null;
+}
+
+/**
+ * Inserts one validated autopost payload and returns its result row.
+ */
+function sblogical_autopost_insert(array $payload): array {
+	$title = sanitize_text_field((string) $payload['title']);
+	$slug = sanitize_title((string) $payload['slug']);
+	$excerpt = sanitize_textarea_field((string) $payload['excerpt']);
+	$content = wp_kses_post((string) $payload['content_html']);
+	$postStatus = sanitize_key((string) $payload['post_status']);
+	$seo = is_array($payload['seo']) ? $payload['seo'] : array();
+	$focusKeyphrase = sanitize_text_field((string) ($seo['focus_keyphrase'] ?? ''));
+	$metaTitle = sanitize_text_field((string) ($seo['meta_title'] ?? ''));
+	$metaDescription = sanitize_textarea_field((string) ($seo['meta_description'] ?? ''));
+	$candidate = is_array($payload['candidate_profile']) ? $payload['candidate_profile'] : array();
+	$candidateName = sanitize_text_field((string) ($candidate['candidate_name'] ?? ''));
+	$electionName = sanitize_text_field((string) ($candidate['election_name'] ?? ''));
+	$electionDate = sanitize_text_field((string) ($candidate['election_date'] ?? ''));
+	$candidateParty = sanitize_text_field((string) ($candidate['party'] ?? ''));
+	$candidateConstituency = sanitize_text_field((string) ($candidate['constituency'] ?? ''));
+	$candidatePosition = sanitize_text_field((string) ($candidate['current_position'] ?? ''));
+	$candidateBio = sanitize_textarea_field((string) ($candidate['short_bio'] ?? ''));
+	$candidateProfileUrl = esc_url_raw((string) ($candidate['profile_source_url'] ?? ''));
+	$candidateImageUrl = esc_url_raw((string) ($candidate['profile_image_url'] ?? ''));
+	$candidateImageSourceUrl = esc_url_raw((string) ($candidate['profile_image_source_url'] ?? ''));
+	$candidateImageCredit = sanitize_text_field((string) ($candidate['profile_image_credit'] ?? ''));
+	$categoryName = sanitize_text_field((string) $payload['category_name']);
+	if ($categoryName === '') {
+		$categoryName = 'Nepal Election 2026';
+	}
+
+	if (! in_array($postStatus, array('publish', 'draft', 'pending', 'future'), true)) {
+		return array(
+			'status' => 'error',
+			'reason' => "Unsupported post_status: {$postStatus}",
+		);
+	}
+
+	// Retries of a request that already succeeded (e.g. the response was lost)
+	// return the post created the first time instead of inserting again.
+	$idempotencyKey = preg_replace('/[^a-f0-9]/', '', strtolower((string) ($payload['idempotency_key'] ?? '')));
+	$idempotencyTransient = $idempotencyKey !== '' ? 'sblogical_autopost_' . $idempotencyKey : '';
+	if ($idempotencyTransient !== '') {
+		$previousId = (int) get_transient($idempotencyTransient);
+		if ($previousId > 0 && get_post_status($previousId) !== false) {
+			return array(
+				'status' => 'skipped',
+				'reason' => 'duplicate_request',
+				'post_id' => $previousId,
+				'post_url' => get_permalink($previousId),
+			);
+		}
+	}
+
+	global $wpdb;
+
+	$existingTitleId = (int) $wpdb->get_var(
+		$wpdb->prepare(
+			"SELECT ID
+			FROM {$wpdb->posts}
+			WHERE post_type = 'post'
+			  AND post_title = %s
+			  AND post_status <> 'trash'
+			ORDER BY ID DESC
+			LIMIT 1",
+			$title
+		)
+	);
+	if ($existingTitleId > 0) {
+		return array(
+			'status' => 'skipped',
+			'reason' => 'duplicate_title',
+			'post_id' => $existingTitleId,
+			'post_url' => get_permalink($existingTitleId),
+		);
+	}
+
+	$existingSlugId = (int) $wpdb->get_var(
+		$wpdb->prepare(
+			"SELECT ID
+			FROM {$wpdb->posts}
+			WHERE post_type = 'post'
+			  AND post_name = %s
+			  AND post_status <> 'trash'
+			ORDER BY ID DESC
+			LIMIT 1",
+			$slug
+		)
+	);
+	if ($existingSlugId > 0) {
+		return array(
+			'status' => 'skipped',
+			'reason' => 'duplicate_slug',
+			'post_id' => $existingSlugId,
+			'post_url' => get_permalink($existingSlugId),
+		);
+	}
+
+	$categoryId = (int) get_cat_ID($categoryName);
+	if ($categoryId <= 0) {
+		$inserted = wp_insert_term($categoryName, 'category');
+		if (! is_wp_error($inserted) && isset($inserted['term_id'])) {
+			$categoryId = (int) $inserted['term_id'];
+		}
+	}
+
+	$postarr = array(
+		'post_type'      => 'post',
+		'post_status'    => $postStatus,
+		'post_title'     => $title,
+		'post_name'      => $slug,
+		'post_excerpt'   => $excerpt,
+		'post_content'   => $content,
+		'post_category'  => $categoryId > 0 ? array($categoryId) : array(),
+		'tags_input'     => array_slice(
+			array_values(
+				array_filter(
+					array_map(
+						static fn ($tag) => sanitize_text_field((string) $tag),
+						is_array($payload['topic_keywords']) ? $payload['topic_keywords'] : array()
+					)
+				)
+			),
+			0,
+			10
+		),
+		'meta_input'     => array(
+			'_sblogical_autopost' => 1,
+			'_sblogical_sources_json' => wp_json_encode($payload['sources'], JSON_UNESCAPED_SLASHES),
+			'_sblogical_candidate_profile_json' => wp_json_encode($candidate, JSON_UNESCAPED_SLASHES),
+			'_sblogical_candidate_name' => $candidateName,
+			'_sblogical_election_name' => $electionName,
+			'_sblogical_election_date' => $electionDate,
+			'_sblogical_candidate_party' => $candidateParty,
+			'_sblogical_candidate_constituency' => $candidateConstituency,
+			'_sblogical_candidate_position' => $candidatePosition,
+			'_sblogical_candidate_bio' => $candidateBio,
+			'_sblogical_candidate_profile_source_url' => $candidateProfileUrl,
+			'_sblogical_candidate_image_url' => $candidateImageUrl,
+			'_sblogical_candidate_image_source_url' => $candidateImageSourceUrl,
+			'_sblogical_candidate_image_credit' => $candidateImageCredit,
+			'_sblogical_focus_keyphrase' => $focusKeyphrase,
+			'_sblogical_meta_title' => $metaTitle,
+			'_sblogical_meta_description' => $metaDescription,
+			'_yoast_wpseo_focuskw' => $focusKeyphrase,
+			'_yoast_wpseo_title' => $metaTitle,
+			'_yoast_wpseo_metadesc' => $metaDescription,
+			'rank_math_focus_keyword' => $focusKeyphrase,
+			'rank_math_title' => $metaTitle,
+			'rank_math_description' => $metaDescription,
+		),
+		'comment_status' => 'closed',
+	);
+
+	$postId = wp_insert_post($postarr, true, false);
+	if (is_wp_error($postId)) {
+		return array(
+			'status' => 'error',
+			'reason' => 'wp_insert_post failed: ' . $postId->get_error_message(),
+		);
+	}
+
+	if ($idempotencyTransient !== '') {
+		set_transient($idempotencyTransient, $postId, 30 * DAY_IN_SECONDS);
+	}
+
+	return array(
+		'status' => 'created',
+		'post_id' => $postId,
+		'post_url' => get_permalink($postId),
+	);
+}
@@ -0,0 +1,41 @@
+<?php
+declare(strict_types=1);
+
+if (PHP_SAPI !== 'cli') {
+	fwrite(STDERR, "This script must run in CLI mode.\n");
+	exit(1);
+}
+
+require_once __DIR__ . DIRECTORY_SEPARATOR . 'wp_autopost_lib.php';
+
+$root = dirname(__DIR__);
+$wpLoad = $root . DIRECTORY_SEPARATOR . 'wp-load.php';
+
+if (! file_exists($wpLoad)) {
+	fwrite(STDERR, "wp-load.php not found at {$wpLoad}\n");
+	exit(1);
+}
+
+require_once $wpLoad;
+
+$titles = sblogical_autopost_titles();
+
+if ($titles === null) {
+	fwrite(STDERR, "Failed to query post titles.\n");
+	exit(1);
+}
+
+$candidates = sblogical_autopost_candidates();
+
+if ($candidates === null) {
+	fwrite(STDERR, "Failed to query candidate names.\n");
+	exit(1);
+}
+
+echo wp_json_encode(
+	array(
+		'titles' => $titles,
+		'candidates' => $candidates,
+	),
+	JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES
+);
@@ -0,0 +1,93 @@
+<?php
+declare(strict_types=1);
+
+/*
+ * Long-lived helper: loads WordPress once, then answers one JSON request per
+ * stdin line with one JSON response per stdout line until stdin closes.
+ *
+ * Requests:  {"op": "titles"} | {"op": "candidates"} | {"op": "insert", "payload": {...}}
+ * Responses: {"ok": true, "result": ...} | {"ok": false, "error": "..."}
+ */
+
+if (PHP_SAPI !== 'cli') {
+	fwrite(STDERR, "This script must run in CLI mode.\n");
+	exit(1);
+}
+
+require_once __DIR__ . DIRECTORY_SEPARATOR . 'wp_autopost_lib.php';
+
+$root = dirname(__DIR__);
+$wpLoad = $root . DIRECTORY_SEPARATOR . 'wp-load.php';
+
+if (! file_exists($wpLoad)) {
+	fwrite(STDERR, "wp-load.php not found at {$wpLoad}\n");
+	exit(1);
+}
+
+// Anything WordPress or a plugin prints would corrupt the line protocol.
+ob_start();
+require_once $wpLoad;
+ob_end_clean();
+
+/**
+ * Handles one decoded request and returns its response envelope.
+ */
+function sblogical_autopost_worker_handle($request): array {
+	if (! is_array($request) || ! isset($request['op'])) {
+		return array('ok' => false, 'error' => 'Invalid request.');
+	}
+
+	switch ($request['op']) {
+		case 'titles':
+			$titles = sblogical_autopost_titles();
+			if ($titles === null) {
+				return array('ok' => false, 'error' => 'Failed to query post titles.');
+			}
+			return array('ok' => true, 'result' => $titles);
+
+		case 'candidates':
+			$candidates = sblogical_autopost_candidates();
+			if ($candidates === null) {
+				return array('ok' => false, 'error' => 'Failed to query candidate names.');
+			}
+			return array('ok' => true, 'result' => $candidates);
+
+		case 'insert':
+			$payload = $request['payload'] ?? null;
+			if (! is_array($payload)) {
+				return array('ok' => false, 'error' => 'Invalid JSON payload.');
+			}
+			$missing = sblogical_autopost_missing_field($payload);
+			if ($missing !== '') {
+				return array('ok' => false, 'error' => "Missing required field: {$missing}");
+			}
+			$result = sblogical_autopost_insert($payload);
+			if ($result['status'] === 'error') {
+				return array('ok' => false, 'error' => $result['reason']);
+			}
+			return array('ok' => true, 'result' => $result);
+	}
+
+	return array('ok' => false, 'error' => 'Unknown op: ' . (string) $request['op']);
+}
+
+while (($line = fgets(STDIN)) !== false) {
+	if (trim($line) === '') {
+		continue;
+	}
+
+	ob_start();
+	try {
+		$response = sblogical_autopost_worker_handle(json_decode($line, true));
+	} catch (Throwable $e) {
+		$response = array('ok' => false, 'error' => get_class($e) . ': ' . $e->getMessage());
+	}
+	ob_end_clean();
+
+	$encoded = wp_json_encode($response, JSON_UNESCAPED_UNICODE | JSON_UNESCAPED_SLASHES);
+	if ($encoded === false) {
+		$encoded = '{"ok":false,"error":"Failed to encode response."}';
+	}
+	echo $encoded . "\n";
+	fflush(STDOUT);
+}